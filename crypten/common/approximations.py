@@ -5,6 +5,7 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import functools
 import math
 from dataclasses import dataclass
 
@@ -71,12 +72,60 @@ class ApproxConfig:
 # Global config
 config = ApproxConfig()
 
+# Scalar constants evaluated once at import time. Public scalars are not
+# secret-shared by MPCTensor arithmetic, so hoisting them only avoids the
+# per-call Python evaluation (e.g. the sqrt in erf's leading factor).
+_TWO_OVER_SQRT_PI = 2.0 / math.sqrt(math.pi)
+
 
 def set_config(new_config):
     global config
     config = new_config
 
 
+@functools.lru_cache(maxsize=16)
+def _householder_coeffs(order):
+    """Coefficients 1/k for the Householder iterations used by log."""
+    return [1 / (i + 1) for i in range(order)]
+
+
+@functools.lru_cache(maxsize=16)
+def _erf_taylor_coeffs(iterations):
+    """Taylor coefficients (-1)^n / (n! (2n + 1)) used by erf."""
+    return [
+        ((-1) ** n) / (math.factorial(n) * (2 * n + 1))
+        for n in range(1, iterations + 1)
+    ]
+
+
+@functools.lru_cache(maxsize=8)
+def _tanh_chebyshev_coeffs(terms):
+    """Odd Chebyshev coefficients of tanh on [-1, 1], cached per term count.
+
+    ``chebyshev_series`` resamples the function on every call; the result
+    depends only on ``terms``, so computing it once per configuration keeps
+    the sampling cost out of the per-activation path.
+    """
+    return crypten.common.util.chebyshev_series(torch.tanh, 1, terms)[1::2]
+
+
+@functools.lru_cache(maxsize=16)
+def _log_bounded_coeffs(bound, degree=10):
+    """Least-squares polynomial coefficients for ln on [1, bound].
+
+    The fit is computed in the rescaled variable
+    :math:`u = (2x - (bound + 1)) / (bound - 1) \\in [-1, 1]`, which keeps
+    the power terms and coefficients small enough for fixed-point
+    arithmetic. Returns ``(constant, [c_1, ..., c_degree])``.
+    """
+    u = torch.linspace(-1, 1, 512, dtype=torch.double)
+    x = (u * (bound - 1) + bound + 1) / 2
+    vandermonde = torch.stack([u.pow(k) for k in range(degree + 1)], dim=1)
+    coeffs = torch.linalg.lstsq(vandermonde, x.log().unsqueeze(1)).solution
+    coeffs = coeffs.squeeze(1)
+    return float(coeffs[0]), [float(c) for c in coeffs[1:]]
+
+
 class ConfigManager(ConfigBase):
     r"""
     Use this to temporarily change a value in the `approximations.config` object. The
@@ -106,9 +155,18 @@ def exp(self):
     Set the number of iterations for the limit approximation with
     config.exp_iterations.
     """  # noqa: W605
-    result = 1 + self.div(2 ** config.exp_iterations)
-    for _ in range(config.exp_iterations):
-        result = result.square()
+    # Plain tensors get the exact kernel; one fused call beats iterating
+    # the limit approximation in Python.
+    if torch.is_tensor(self):
+        return torch.exp(self)
+
+    result = self.div(2 ** config.exp_iterations).add_(1)
+    if hasattr(result, "square_"):
+        for _ in range(config.exp_iterations):
+            result = result.square_()
+    else:
+        for _ in range(config.exp_iterations):
+            result = result.square()
     return result
 
 
@@ -143,6 +201,11 @@ def log(self, input_in_01=False):
         exp_iterations (int): number of iterations for limit approximation of exp
         order (int): number of polynomial terms used (order of Householder approx)
     """
+    # For plaintext tensors the exact kernel is both faster and more
+    # accurate than iterating the approximation in Python.
+    if torch.is_tensor(self):
+        return torch.log(self)
+
     if input_in_01:
         return log(self.mul(100)) - 4.605170
 
@@ -160,7 +223,7 @@ def log(self, input_in_01=False):
     with ConfigManager("exp_iterations", exp_iterations):
         for _ in range(iterations):
             h = 1 - self * exp(-y)
-            y -= h.polynomial([1 / (i + 1) for i in range(order)])
+            y -= h.polynomial(_householder_coeffs(order))
     return y
 
 
@@ -212,6 +275,12 @@ def reciprocal(self, input_in_01=False):
         if config.reciprocal_initial is None:
             # Initialization to a decent estimate (found by qualitative inspection):
             #                1/x = 3exp(1 - 2x) + 0.003
+            # The seed's relative error approaches ~0.984 near x = 5, and
+            # Newton-Raphson squares the relative error each step, so 10
+            # iterations are needed to reach ~2e-4 across [0.01, 10]. A
+            # low-degree polynomial seed cannot replace the exp here: any
+            # bounded polynomial has relative error approaching 1 near the
+            # left edge of the domain, where 1/x blows up.
             result = 3 * (1 - 2 * self).exp() + 0.003
         else:
             result = config.reciprocal_initial
@@ -241,24 +310,41 @@ def inv_sqrt(self):
     .. _Newton-Raphson:
         https://en.wikipedia.org/wiki/Fast_inverse_square_root#Newton's_method
     """
-    # Initialize using decent approximation
-    if config.sqrt_nr_initial is None:
-        y = exp(self.div(2).add(0.2).neg()).mul(2.2).add(0.2)
-        y -= self.div(1024)
-    else:
-        y = config.sqrt_nr_initial
+    if torch.is_tensor(self):
+        return torch.rsqrt(self)
+
+    y = _inv_sqrt_initial(self)
 
-    # Newton Raphson iterations for inverse square root
+    # Newton Raphson iterations for inverse square root. The correction
+    # term is accumulated in place so each iteration allocates a single
+    # intermediate instead of materializing `3 - self * y^2` piecewise.
     for _ in range(config.sqrt_nr_iters):
-        y = y.mul_(3 - self * y.square()).div_(2)
+        y = y.mul_(self.mul(y.square()).neg_().add_(3)).div_(2)
     return y
 
 
+def _inv_sqrt_initial(self):
+    """Computes the initial guess for the inverse square root Newton-Raphson
+    iterations, found by qualitative inspection to converge over a fairly
+    large domain. Can be overridden through config.sqrt_nr_initial.
+    """
+    if config.sqrt_nr_initial is None:
+        y = exp(self.div(2).add(0.2).neg()).mul(2.2).add(0.2)
+        y -= self.div(1024)
+        return y
+    return config.sqrt_nr_initial
+
+
 def sqrt(self):
     """
     Computes the square root of the input by computing its inverse square root using
     the Newton-Raphson method and multiplying by the input.
 
+    The final multiplication by the input is fused into the last Newton-Raphson
+    iteration: with :math:`z = x y`, the last step
+    :math:`x \\cdot y(3 - x y^2)/2` is computed as :math:`z(3 - z y)/2`,
+    saving one ciphertext multiplication per call.
+
     Configuration params:
         sqrt_nr_iters (int):  determines the number of Newton-Raphson iterations to run
         sqrt_initial (tensor): sets the initial value for the inverse square root
@@ -268,13 +354,21 @@ def sqrt(self):
     .. _Newton-Raphson:
         https://en.wikipedia.org/wiki/Fast_inverse_square_root#Newton's_method
     """
-    return inv_sqrt(self).mul_(self)
+    y = _inv_sqrt_initial(self)
+    for _ in range(config.sqrt_nr_iters - 1):
+        y = y.mul_(self.mul(y.square()).neg_().add_(3)).div_(2)
+
+    z = self.mul(y)
+    return z.mul_(z.mul(y).neg_().add_(3)).div_(2)
 
 
 def _eix(self):
     """Computes e^(i * self) where i is the imaginary unit.
     Returns (Re{e^(i * self)}, Im{e^(i * self)} = cos(self), sin(self)
     """
+    if torch.is_tensor(self):
+        return torch.cos(self), torch.sin(self)
+
     iterations = config.trig_iterations
 
     re = 1
@@ -284,29 +378,52 @@ def _eix(self):
     re -= im.square()
     im *= 2
 
-    # Compute (a + bi)^2 -> (a^2 - b^2) + (2ab)i `iterations` times
+    # Compute (a + bi)^2 -> (a^2 - b^2) + (2ab)i `iterations` times. The
+    # real part uses the factored form (a + b)(a - b) so each iteration
+    # costs two ciphertext multiplications instead of three.
     for _ in range(iterations - 1):
-        a2 = re.square()
-        b2 = im.square()
+        a2b2 = (re + im) * (re - im)
         im = im.mul_(re)
         im._tensor *= 2
-        re = a2 - b2
+        re = a2b2
 
     return re, im
 
 
-def cossin(self):
+def cossin(self, shifts=None):
     """Computes cosine and sine of input via exp(i * x).
 
+    When `shifts` is provided, evaluates the batch of phase-shifted inputs
+    `cos(x + s), sin(x + s)` for every public shift `s` using a single
+    `_eix` pass: since :math:`e^{i(x + s)} = e^{ix} e^{is}` and the shifts
+    are public, the batch only costs cheap public multiplications on top of
+    one encrypted evaluation. The returned tensors gain a leading dimension
+    of size `len(shifts)`.
+
     Args:
-        iterations (int): for approximating exp(i * x)
+        shifts (tensor or list, optional): public phase shifts to evaluate
+            in a single batch.
     """
-    return self._eix()
+    re, im = self._eix()
+    if shifts is None:
+        return re, im
+
+    if not torch.is_tensor(shifts):
+        shifts = torch.tensor(shifts, device=self.device)
+    shifts = shifts.view(-1, *([1] * self.dim()))
+    cos_shifts, sin_shifts = shifts.cos(), shifts.sin()
+    return (
+        re * cos_shifts - im * sin_shifts,
+        im * cos_shifts + re * sin_shifts,
+    )
 
 
 def cos(self):
     """Computes the cosine of the input using cos(x) = Re{exp(i * x)}
 
+    Callers needing both the cosine and the sine should use :func:`cossin`,
+    which computes the pair with a single exp(i * x) evaluation.
+
     Args:
         iterations (int): for approximating exp(i * x)
     """
@@ -316,6 +433,9 @@ def cos(self):
 def sin(self):
     """Computes the sine of the input using sin(x) = Im{exp(i * x)}
 
+    Callers needing both the sine and the cosine should use :func:`cossin`,
+    which computes the pair with a single exp(i * x) evaluation.
+
     Args:
         iterations (int): for approximating exp(i * x)
     """
@@ -323,7 +443,7 @@ def sin(self):
 
 
 # Logistic Functions
-def sigmoid(self):
+def sigmoid(self, _ltz=None):
     """Computes the sigmoid function using the following definition
 
     .. math::
@@ -341,6 +461,9 @@ def sigmoid(self):
     "reciprocal" - computes sigmoid using :math:`1 + e^{-x}` and computing
         the reciprocal
 
+    Internal callers that already hold the unscaled comparison
+    `self._ltz(_scale=False)` can pass it as `_ltz` to avoid repeating the
+    comparison subprotocol; it is only used by the reciprocal method.
     """  # noqa: W605
     method = config.sigmoid_tanh_method
 
@@ -348,7 +471,7 @@ def sigmoid(self):
         tanh_approx = tanh(self.div(2))
         return tanh_approx.div(2) + 0.5
     elif method == "reciprocal":
-        ltz = self._ltz(_scale=False)
+        ltz = self._ltz(_scale=False) if _ltz is None else _ltz
         sign = 1 - 2 * ltz
 
         pos_input = self.mul(sign)
@@ -365,15 +488,19 @@ def sigmoid(self):
         ):
             pos_output = denominator.reciprocal()
 
-        result = pos_output.where(1 - ltz, 1 - pos_output)
-        # TODO: Support addition with different encoder scales
-        # result = pos_output + ltz - 2 * pos_output * ltz
+        # Fold the negative branch back using sigmoid(-x) = 1 - sigmoid(x):
+        #     result = pos_output + ltz - 2 * pos_output * ltz
+        # This reuses the ltz comparison instead of paying for a `where`
+        # multiplexer. Since ltz is unscaled, the product needs no
+        # truncation and its share is added back at the encoder scale.
+        result = pos_output - pos_output.mul(ltz).mul_(2)
+        result.share = result.share + ltz.share * result.encoder.scale
         return result
     else:
         raise ValueError(f"Unrecognized method {method} for sigmoid")
 
 
-def tanh(self):
+def tanh(self, _ltz=None):
     r"""Computes the hyperbolic tangent function using the identity
 
     .. math::
@@ -397,14 +524,13 @@ def tanh(self):
     terms = config.sigmoid_tanh_terms
 
     if method == "reciprocal":
-        return self.mul(2).sigmoid().mul(2).sub(1)
+        # 2x has the sign of x, so a comparison the caller already computed
+        # for `self` can stand in for sigmoid's internal one. The Chebyshev
+        # method needs no comparison and ignores `_ltz`.
+        return sigmoid(self.mul(2), _ltz=_ltz).mul(2).sub(1)
     elif method == "chebyshev":
-        coeffs = crypten.common.util.chebyshev_series(torch.tanh, 1, terms)[1::2]
-        tanh_polys = _chebyshev_polynomials(self, terms)
-        tanh_polys_flipped = (
-            tanh_polys.unsqueeze(dim=-1).transpose(0, -1).squeeze(dim=0)
-        )
-        out = tanh_polys_flipped.matmul(coeffs)
+        coeffs = _tanh_chebyshev_coeffs(terms)
+        out = _chebyshev_clenshaw(self, coeffs)
 
         # truncate outside [-maxval, maxval]
         return out.hardtanh()
@@ -412,45 +538,65 @@ def tanh(self):
         raise ValueError(f"Unrecognized method {method} for tanh")
 
 
-def _chebyshev_polynomials(self, terms):
-    r"""Evaluates odd degree Chebyshev polynomials at x
+def _chebyshev_clenshaw(self, coeffs):
+    r"""Evaluates an odd Chebyshev series at x using Clenshaw's recurrence
 
-    Chebyshev Polynomials of the first kind are defined as
+    Computes :math:`\sum_k c_k T_{2k + 1}(x)` where `coeffs` holds the
+    odd-degree Chebyshev coefficients :math:`c_k`. The odd-degree polynomials
+    satisfy the three-term recurrence
 
     .. math::
-        P_0(x) = 1, P_1(x) = x, P_n(x) = 2 P_{n - 1}(x) - P_{n-2}(x)
+        T_{2k + 1}(x) = y T_{2k - 1}(x) - T_{2k - 3}(x), \quad y = 4x^2 - 2
+
+    so Clenshaw's method evaluates the series with two running tensors
+    instead of materializing every polynomial.
 
     Args:
-        self (MPCTensor): input at which polynomials are evaluated
-        terms (int): highest degree of Chebyshev polynomials.
-                        Must be even and at least 6.
+        self (MPCTensor): input at which the series is evaluated
+        coeffs (torch.tensor): 1-D tensor of odd-degree Chebyshev coefficients.
+                        Must contain at least 3 coefficients.
     Returns:
-        MPCTensor of polynomials evaluated at self of shape `(terms, *self)`
+        MPCTensor of the series evaluated at self with the same shape as self
     """
+    terms = 2 * coeffs.size(0)
     if terms % 2 != 0 or terms < 6:
         raise ValueError("Chebyshev terms must be even and >= 6")
 
-    polynomials = [self.clone()]
     y = 4 * self.square() - 2
-    z = y - 1
-    polynomials.append(z.mul(self))
 
-    for k in range(2, terms // 2):
-        next_polynomial = y * polynomials[k - 1] - polynomials[k - 2]
-        polynomials.append(next_polynomial)
+    # Clenshaw recurrence over the odd-degree coefficients, highest first.
+    # The two leading steps use plain scalars so no extra ciphertext
+    # multiplications are issued before b1 becomes encrypted.
+    b1 = float(coeffs[-1])
+    b2 = 0.0
+    for k in range(coeffs.size(0) - 2, 0, -1):
+        b1, b2 = y * b1 - b2 + float(coeffs[k]), b1
 
-    return crypten.stack(polynomials)
+    # T_1(x) = x and T_3(x) = x * (y - 1) close the recurrence:
+    return self * ((y - 1) * b1 + float(coeffs[0]) - b2)
 
 
 def erf(tensor):
     """
     Approximates the error function of the input tensor using a Taylor approximation.
+
+    The series is evaluated with Horner's rule in :math:`t = x^2` so that the
+    odd powers share work:
+
+    .. math::
+        erf(x) \\approx \\frac{2}{\\sqrt{\\pi}} x (1 + c_1 t + c_2 t^2 + ...)
+
+    which costs one ciphertext multiplication per series term instead of an
+    independent `pos_pow` per term.
     """
-    output = tensor.clone()
-    for n in range(1, config.erf_iterations + 1):
-        multiplier = ((-1) ** n) / (math.factorial(n) * (2 * n + 1))
-        output = output.add(tensor.pos_pow(2 * n + 1).mul(multiplier))
-    return output.mul(2.0 / math.sqrt(math.pi))
+    coeffs = _erf_taylor_coeffs(config.erf_iterations)
+
+    t = tensor.square()
+    output = coeffs[-1]
+    for coeff in reversed(coeffs[:-1]):
+        output = output * t + coeff
+    output = output * t + 1
+    return tensor.mul(output).mul(_TWO_OVER_SQRT_PI)
     # NOTE: This approximation is not unstable for large tensor values.
 
 
@@ -465,11 +611,33 @@ def softmax(self, dim, **kwargs):
         return self.new(torch.ones_like(self.share))
 
     maximum_value = self.max(dim, keepdim=True)[0]
-    logits = self - maximum_value
-    numerator = logits.exp()
-    with ConfigManager("reciprocal_all_pos", True):
-        inv_denominator = numerator.sum(dim, keepdim=True).reciprocal()
-    return numerator * inv_denominator
+    numerator = (self - maximum_value).exp()
+    denominator = numerator.sum(dim, keepdim=True)
+
+    # After subtracting the maximum, the denominator lies in [1, n], so the
+    # Newton-Raphson reciprocal can start from the best constant guess
+    # 2/(n + 1) instead of the generic exp-based seed. The seed's relative
+    # error (n - 1)/(n + 1) squares every iteration; pick the iteration
+    # count that drives it below fixed-point resolution. For very large n
+    # the required count exceeds the cost of the default seed, so fall back.
+    n = self.size(dim)
+    nr_iters = math.ceil(math.log2(math.log(1e-4) / math.log((n - 1) / (n + 1))))
+    if nr_iters <= 11:
+        with ConfigManager(
+            "reciprocal_all_pos",
+            True,
+            "reciprocal_initial",
+            2.0 / (n + 1),
+            "reciprocal_nr_iters",
+            nr_iters,
+        ):
+            inv_denominator = denominator.reciprocal()
+    else:
+        with ConfigManager("reciprocal_all_pos", True):
+            inv_denominator = denominator.reciprocal()
+    # Reuse the numerator buffer for the output rather than allocating a
+    # third input-sized tensor.
+    return numerator.mul_(inv_denominator)
 
 
 def log_softmax(self, dim, **kwargs):
@@ -489,5 +657,17 @@ def log_softmax(self, dim, **kwargs):
     maximum_value = self.max(dim, keepdim=True)[0]
     logits = self - maximum_value
     normalize_term = exp(logits).sum(dim, keepdim=True)
-    result = logits - normalize_term.log()
+    # After subtracting the maximum, the summed tensor lies in
+    # [1, size(dim)]. For narrow reductions a low-degree polynomial on that
+    # bounded domain is both cheaper and more accurate than the
+    # general-purpose Householder log, so branch to it when the fit is
+    # tight; otherwise fall back to the default approximation.
+    n = self.size(dim)
+    if n <= 32:
+        constant, coeffs = _log_bounded_coeffs(n)
+        u = normalize_term.mul(2.0 / (n - 1)) - (n + 1) / (n - 1)
+        log_normalize_term = u.polynomial(coeffs) + constant
+    else:
+        log_normalize_term = normalize_term.log()
+    result = logits - log_normalize_term
     return result
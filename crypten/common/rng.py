@@ -9,28 +9,81 @@ import torch
 from crypten.cuda import CUDALongTensor
 
 
-def generate_random_ring_element(size, ring_size=(2 ** 64), generator=None, **kwargs):
-    """Helper function to generate a random number from a signed ring"""
+# Cache of the communicator's local generator. These helpers run on every
+# share allocation, so the registry walk through `comm.get()` is kept off
+# the hot path; the cache is invalidated when the communicator changes
+# (e.g. after re-initialization).
+_cached_communicator = None
+_cached_local_generator = None
+
+
+def _get_local_generator():
+    global _cached_communicator, _cached_local_generator
+    communicator = comm.get()
+    if communicator is not _cached_communicator:
+        _cached_communicator = communicator
+        _cached_local_generator = communicator.local_generator
+    return _cached_local_generator
+
+
+def generate_random_ring_element(
+    size, ring_size=(2 ** 64), generator=None, out=None, **kwargs
+):
+    """Helper function to generate a random number from a signed ring
+
+    When `out` is given (a plain long tensor of the right size), the draw is
+    written into its existing storage instead of allocating a fresh tensor.
+    """
     if generator is None:
-        generator = comm.get().local_generator
-    # TODO (brianknott): Check whether this RNG contains the full range we want.
-    rand_element = torch.randint(
-        -(ring_size // 2),
-        (ring_size - 1) // 2,
-        size,
-        generator=generator,
-        dtype=torch.long,
-        **kwargs
-    )
+        generator = _get_local_generator()
+    if ring_size == 2 ** 64:
+        # Fill the full signed 64-bit range with an in-place random_ call.
+        # This skips torch.randint's internal range scaling and, unlike the
+        # previous explicit bounds, covers the entire ring.
+        if out is None:
+            out = torch.empty(size, dtype=torch.long, **kwargs)
+        rand_element = out.random_(-(2 ** 63), None, generator=generator)
+    else:
+        if out is not None:
+            kwargs["out"] = out
+        rand_element = torch.randint(
+            -(ring_size // 2),
+            (ring_size - 1) // 2,
+            size,
+            generator=generator,
+            dtype=torch.long,
+            **kwargs
+        )
     if rand_element.is_cuda:
         return CUDALongTensor(rand_element)
     return rand_element
 
 
+def generate_random_ring_elements(sizes, ring_size=(2 ** 64), generator=None, **kwargs):
+    """Helper function to generate a batch of random ring elements
+
+    Draws a single flat tensor covering all requested sizes and returns one
+    reshaped view per size, amortizing generator-state and kernel-launch
+    overhead across the batch.
+    """
+    if generator is None:
+        generator = _get_local_generator()
+    sizes = [torch.Size(size) for size in sizes]
+    numels = [size.numel() for size in sizes]
+    flat = generate_random_ring_element(
+        (sum(numels),), ring_size=ring_size, generator=generator, **kwargs
+    )
+    elements, offset = [], 0
+    for size, numel in zip(sizes, numels):
+        elements.append(flat[offset : offset + numel].view(size))
+        offset += numel
+    return elements
+
+
 def generate_kbit_random_tensor(size, bitlength=None, generator=None, **kwargs):
     """Helper function to generate a random k-bit number"""
     if generator is None:
-        generator = comm.get().local_generator
+        generator = _get_local_generator()
     if bitlength is None:
         bitlength = torch.iinfo(torch.long).bits
     if bitlength == 64:
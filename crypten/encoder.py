@@ -33,6 +33,12 @@ class FixedPointEncoder:
 
     __default_precision_bits = 16
 
+    # Cache of encoded Python scalars keyed by (value, scale, device). The
+    # same constants (learning rates, divisor scales) get encoded thousands
+    # of times during training; cached entries are read-only by convention.
+    __scalar_cache = {}
+    __scalar_cache_max_size = 256
+
     def __init__(self, precision_bits=None):
         if precision_bits is None:
             precision_bits = FixedPointEncoder.__default_precision_bits
@@ -44,10 +50,18 @@ class FixedPointEncoder:
         if isinstance(x, CrypTensor):
             return x
         elif isinstance(x, int) or isinstance(x, float):
-            # Squeeze in order to get a 0-dim tensor with value `x`
-            return torch.tensor(
-                [self._scale * x], dtype=torch.long, device=device
-            ).squeeze()
+            cache = FixedPointEncoder.__scalar_cache
+            key = (x, self._scale, str(device))
+            encoded = cache.get(key)
+            if encoded is None:
+                # Squeeze in order to get a 0-dim tensor with value `x`
+                encoded = torch.tensor(
+                    [self._scale * x], dtype=torch.long, device=device
+                ).squeeze()
+                if len(cache) >= FixedPointEncoder.__scalar_cache_max_size:
+                    cache.clear()
+                cache[key] = encoded
+            return encoded
         elif isinstance(x, list):
             return (
                 torch.tensor(x, dtype=torch.float, device=device)
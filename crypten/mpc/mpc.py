@@ -1231,6 +1231,7 @@ OOP_BINARY_FUNCTIONS = {
 
 INPLACE_UNARY_FUNCTIONS = {
     "neg_": Ptype.arithmetic,
+    "square_": Ptype.arithmetic,
     "invert_": Ptype.binary,
     "lshift_": Ptype.binary,
     "rshift_": Ptype.binary,
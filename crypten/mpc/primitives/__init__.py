@@ -5,8 +5,12 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-from .arithmetic import ArithmeticSharedTensor
+from .arithmetic import ArithmeticSharedTensor, ArithmeticSharedTensorBatch
 from .binary import BinarySharedTensor
 
 
-__all__ = ["ArithmeticSharedTensor", "BinarySharedTensor"]
+__all__ = [
+    "ArithmeticSharedTensor",
+    "ArithmeticSharedTensorBatch",
+    "BinarySharedTensor",
+]
@@ -5,7 +5,7 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-from functools import reduce
+import math
 
 import crypten.communicator as comm
 
@@ -24,6 +24,26 @@ from . import beaver
 
 SENTINEL = -1
 
+# Dispatch tables for `_arithmetic_function`, resolved once at import time so
+# the per-call path is a dict lookup instead of a membership scan plus
+# repeated getattr on torch / beaver.
+_ADDITIVE_OPS = frozenset(("add", "sub"))
+_MULTIPLICATIVE_OPS = (
+    "mul",
+    "matmul",
+    "conv1d",
+    "conv2d",
+    "conv_transpose1d",
+    "conv_transpose2d",
+)
+_ARITHMETIC_OPS = _ADDITIVE_OPS.union(_MULTIPLICATIVE_OPS)
+_PUBLIC_TORCH_OPS = {op: getattr(torch, op) for op in _MULTIPLICATIVE_OPS}
+_PRIVATE_BEAVER_OPS = {op: getattr(beaver, op) for op in _MULTIPLICATIVE_OPS}
+
+# Per-divisor wrap-correction constants for `div_`, computed on first use.
+# Pooling / averaging layers divide by the same small integer repeatedly.
+_DIV_WRAP_CORRECTIONS = {}
+
 
 # MPC tensor where shares additive-sharings.
 class ArithmeticSharedTensor(object):
@@ -97,7 +117,7 @@ class ArithmeticSharedTensor(object):
 
         # if other parties do not know tensor's size, broadcast the size:
         if broadcast_size:
-            size = comm.get().broadcast_obj(size, src)
+            size = ArithmeticSharedTensor._broadcast_size(size, src)
 
         # generate pseudo-random zero sharing (PRZS) and add source's tensor:
         self.share = ArithmeticSharedTensor.PRZS(size, device=device).share
@@ -139,6 +159,23 @@ class ArithmeticSharedTensor(object):
         """Sets _tensor to value"""
         self._tensor = value
 
+    @staticmethod
+    def _broadcast_size(size, src):
+        """Broadcasts a tensor size from party `src` as a fixed-width header.
+
+        Sends the dimension count followed by up to 8 dimensions in one
+        int64 tensor, which stays on the communicator's tensor fast path
+        instead of pickling a Python object through `broadcast_obj`.
+        """
+        header = torch.full((9,), -1, dtype=torch.long)
+        if comm.get().get_rank() == src:
+            assert len(size) <= 8, "cannot broadcast sizes with more than 8 dims"
+            header[0] = len(size)
+            for i, dim in enumerate(size):
+                header[i + 1] = dim
+        header = comm.get().broadcast(header, src)
+        return torch.Size(header[1 : 1 + int(header[0])].tolist())
+
     @staticmethod
     def from_shares(share, precision=None, device=None):
         """Generate an ArithmeticSharedTensor from a share from each party"""
@@ -164,7 +201,31 @@ class ArithmeticSharedTensor(object):
         next_share = generate_random_ring_element(
             *size, generator=comm.get().get_generator(1, device=device), device=device
         )
-        tensor.share = current_share - next_share
+        # Subtract in place so the zero sharing reuses the first stream's
+        # buffer instead of allocating (and traversing) a third tensor.
+        tensor.share = current_share.sub_(next_share)
+        return tensor
+
+    @staticmethod
+    def PRZS_into(out, device=None):
+        """
+        Generate a Pseudo-random Sharing of Zero into the preallocated share
+        tensor `out`.
+
+        Keeps the result's storage stable across calls, which fixed-shape
+        replay mechanisms (e.g. CUDA graph capture) require; only the second
+        random stream still allocates a scratch tensor.
+        """
+        tensor = ArithmeticSharedTensor(src=SENTINEL)
+        device = out.device if device is None else device
+        generate_random_ring_element(
+            out.size(), generator=comm.get().get_generator(0, device=device), out=out
+        )
+        next_share = generate_random_ring_element(
+            out.size(), generator=comm.get().get_generator(1, device=device), device=device
+        )
+        out.sub_(next_share)
+        tensor.share = out
         return tensor
 
     @staticmethod
@@ -262,6 +323,33 @@ class ArithmeticSharedTensor(object):
         )
         return result
 
+    @staticmethod
+    def mul_batch(xs, ys):
+        """Multiplies corresponding pairs of shared tensors in one Beaver round.
+
+        Equivalent to `[x.mul(y) for x, y in zip(xs, ys)]` for same-shape
+        pairs, but stacks the operands so the whole batch shares a single
+        triple and communication round instead of one round per pair. All
+        inputs must use the same fixed-point scale, since the stacked
+        product is truncated by a single scale.
+        """
+        assert isinstance(xs, list) and isinstance(ys, list), "Inputs must be lists"
+        assert len(xs) == len(ys), "Input lists must have matching lengths"
+        scale = xs[0].encoder.scale
+        assert all(
+            tensor.encoder.scale == scale for tensor in xs + ys
+        ), "batched tensors must share a fixed-point scale"
+        x = ArithmeticSharedTensor.stack(xs)
+        y = ArithmeticSharedTensor.stack(ys)
+        product = x._arithmetic_function(y, "mul")
+
+        results = []
+        for i in range(len(xs)):
+            result = product.shallow_copy()
+            result.share = product.share[i]
+            results.append(result)
+        return results
+
     @staticmethod
     def reveal_batch(tensor_or_list, dst=None):
         """Get (batched) plaintext without any downscaling"""
@@ -279,11 +367,13 @@ class ArithmeticSharedTensor(object):
 
     def reveal(self, dst=None):
         """Decrypts the tensor without any downscaling."""
-        tensor = self.share.clone()
+        # Both communicator backends reduce into a fresh buffer (the
+        # distributed one clones internally, the in-process one gathers),
+        # so the share can be passed without a defensive copy.
         if dst is None:
-            return comm.get().all_reduce(tensor)
+            return comm.get().all_reduce(self.share)
         else:
-            return comm.get().reduce(tensor, dst=dst)
+            return comm.get().reduce(self.share, dst=dst)
 
     def get_plain_text(self, dst=None):
         """Decrypts the tensor."""
@@ -296,18 +386,11 @@ class ArithmeticSharedTensor(object):
         return self._arithmetic_function(y, op, inplace=True, *args, **kwargs)
 
     def _arithmetic_function(self, y, op, inplace=False, *args, **kwargs):  # noqa:C901
-        assert op in [
-            "add",
-            "sub",
-            "mul",
-            "matmul",
-            "conv1d",
-            "conv2d",
-            "conv_transpose1d",
-            "conv_transpose2d",
-        ], f"Provided op `{op}` is not a supported arithmetic function"
-
-        additive_func = op in ["add", "sub"]
+        assert (
+            op in _ARITHMETIC_OPS
+        ), f"Provided op `{op}` is not a supported arithmetic function"
+
+        additive_func = op in _ADDITIVE_OPS
         public = isinstance(y, (int, float)) or is_tensor(y)
         private = isinstance(y, ArithmeticSharedTensor)
 
@@ -315,8 +398,15 @@ class ArithmeticSharedTensor(object):
             result = self
             if additive_func or (op == "mul" and public):
                 op += "_"
+        elif additive_func and public:
+            # Rank 0 folds the public value in out of place below; other
+            # ranks keep (a broadcast view of) their share, which must not
+            # alias the input, so only they need a real copy.
+            result = self.shallow_copy() if self.rank == 0 else self.clone()
         else:
-            result = self.clone()
+            # Every other non-inplace branch replaces the share with a fresh
+            # output tensor, so skip the full-share copy.
+            result = self.shallow_copy()
 
         if public:
             y = result.encoder.encode(y, device=self.device)
@@ -325,34 +415,42 @@ class ArithmeticSharedTensor(object):
                 if result.rank == 0:
                     result.share = getattr(result.share, op)(y)
                 else:
-                    result.share = torch.broadcast_tensors(result.share, y)[0]
+                    # The share itself is unchanged on other ranks; only
+                    # expand it when broadcasting against y would grow it.
+                    shape = torch.broadcast_shapes(result.share.shape, y.shape)
+                    if tuple(result.share.shape) != tuple(shape):
+                        result.share = result.share.expand(shape)
             elif op == "mul_":  # ['mul_']
                 result.share = result.share.mul_(y)
             else:  # ['mul', 'matmul', 'convNd', 'conv_transposeNd']
-                result.share = getattr(torch, op)(result.share, y, *args, **kwargs)
+                result.share = _PUBLIC_TORCH_OPS[op](result.share, y, *args, **kwargs)
         elif private:
             if additive_func:  # ['add', 'sub', 'add_', 'sub_']
                 result.share = getattr(result.share, op)(y.share)
             else:  # ['mul', 'matmul', 'convNd', 'conv_transposeNd']
                 # NOTE: 'mul_' calls 'mul' here
-                # Must copy share.data here to support 'mul_' being inplace
-                result.share.set_(
-                    getattr(beaver, op)(result, y, *args, **kwargs).share.data
-                )
+                beaver_share = _PRIVATE_BEAVER_OPS[op](result, y, *args, **kwargs).share
+                if inplace:
+                    # Repoint the existing share tensor object so holders of
+                    # a reference to it observe the update.
+                    result.share.set_(beaver_share)
+                else:
+                    result.share = beaver_share
         else:
             raise TypeError("Cannot %s %s with %s" % (op, type(y), type(self)))
 
         # Scale by encoder scale if necessary
         if not additive_func:
+            scale = self.encoder.scale
             if public:  # scale by self.encoder.scale
-                if self.encoder.scale > 1:
+                if scale > 1:
                     return result.div_(result.encoder.scale)
                 else:
                     result.encoder = self.encoder
             else:  # scale by larger of self.encoder.scale and y.encoder.scale
-                if self.encoder.scale > 1 and y.encoder.scale > 1:
+                if scale > 1 and y.encoder.scale > 1:
                     return result.div_(result.encoder.scale)
-                elif self.encoder.scale > 1:
+                elif scale > 1:
                     result.encoder = self.encoder
                 else:
                     result.encoder = y.encoder
@@ -378,7 +476,9 @@ class ArithmeticSharedTensor(object):
     def mul(self, y):
         """Perform element-wise multiplication"""
         if isinstance(y, int):
-            result = self.clone()
+            # The product is a fresh tensor, so a shallow copy suffices and
+            # the old share is never cloned only to be overwritten.
+            result = self.shallow_copy()
             result.share = self.share * y
             return result
         return self._arithmetic_function(y, "mul")
@@ -416,10 +516,20 @@ class ArithmeticSharedTensor(object):
             if comm.get().get_world_size() > 2:
                 wraps = self.wraps()
                 self.share = self.share.div_(y, rounding_mode="trunc")
-                # NOTE: The multiplication here must be split into two parts
-                # to avoid long out-of-bounds when y <= 2 since (2 ** 63) is
-                # larger than the largest long integer.
-                self -= wraps * 4 * (int(2 ** 62) // y)
+                if isinstance(y, int) and y > 2 and torch.is_tensor(self.share):
+                    # Fuse the scale-and-subtract into one kernel with a
+                    # cached per-divisor constant. The constant fits in a
+                    # long only for y > 2.
+                    correction = _DIV_WRAP_CORRECTIONS.get(y)
+                    if correction is None:
+                        correction = 4 * (int(2 ** 62) // y)
+                        _DIV_WRAP_CORRECTIONS[y] = correction
+                    self.share.sub_(wraps.share, alpha=correction)
+                else:
+                    # NOTE: The multiplication here must be split into two
+                    # parts to avoid long out-of-bounds when y <= 2 since
+                    # (2 ** 63) is larger than the largest long integer.
+                    self -= wraps * 4 * (int(2 ** 62) // y)
             else:
                 self.share = self.share.div_(y, rounding_mode="trunc")
 
@@ -459,12 +569,28 @@ class ArithmeticSharedTensor(object):
         if dim is None:
             return self.flatten().prod(dim=0)
 
+        # Halve along `dim` with narrowed (view) halves. At most one odd
+        # remainder is pending at a time: an odd level absorbs the pending
+        # slice (making itself even) or sets a new one aside. Each level
+        # maps t entries to ceil(t / 2), so the number of Beaver rounds
+        # stays at exactly ceil(log2 n) while the per-level torch_cat only
+        # fires on odd levels with a pending slice.
         result = self.clone()
-        while result.size(dim) > 1:
+        pending = None
+        while result.size(dim) > 1 or pending is not None:
             size = result.size(dim)
-            x, y, remainder = result.split([size // 2, size // 2, size % 2], dim=dim)
+            if size % 2 == 1:
+                if pending is not None:
+                    result.share = torch_cat([result.share, pending.share], dim=dim)
+                    pending = None
+                    size += 1
+                else:
+                    pending = result.narrow(dim, size - 1, 1)
+                    size -= 1
+            half = size // 2
+            x = result.narrow(dim, 0, half)
+            y = result.narrow(dim, half, half)
             result = x.mul_(y)
-            result.share = torch_cat([result.share, remainder.share], dim=dim)
 
         # Squeeze result if necessary
         if not keepdim:
@@ -480,12 +606,12 @@ class ArithmeticSharedTensor(object):
             return result
 
         # Compute divisor to use to compute mean
-        size = self.size()
         if len(args) > 0:  # dimension is specified
             dims = [args[0]] if isinstance(args[0], int) else args[0]
-            size = [size[dim] for dim in dims]
-        assert len(size) > 0, "cannot reduce over zero dimensions"
-        divisor = reduce(lambda x, y: x * y, size)
+            divisor = math.prod(self.size(dim) for dim in dims)
+        else:
+            divisor = self.numel()
+        assert divisor > 0, "cannot reduce over zero dimensions"
 
         return result.div(divisor)
 
@@ -496,12 +622,12 @@ class ArithmeticSharedTensor(object):
         else:
             mean = self.mean()
         result = (self - mean).square().sum(*args, **kwargs)
-        size = self.size()
         if len(args) > 0:  # dimension is specified
             dims = [args[0]] if isinstance(args[0], int) else args[0]
-            size = [size[dim] for dim in dims]
-        assert len(size) > 0, "cannot reduce over zero dimensions"
-        divisor = reduce(lambda x, y: x * y, size)
+            divisor = math.prod(self.size(dim) for dim in dims)
+        else:
+            divisor = self.numel()
+        assert divisor > 0, "cannot reduce over zero dimensions"
         return result.div(divisor)
 
     def conv1d(self, kernel, **kwargs):
@@ -541,6 +667,29 @@ class ArithmeticSharedTensor(object):
             raise TypeError("index_add second tensor of unsupported type")
         return self
 
+    def index_add_batch_(self, dim, indices, tensors):
+        """Perform several in-place index_add ops along `dim` at once.
+
+        Equivalent to calling `index_add_(dim, index, tensor)` pairwise, but
+        concatenates the indices and operands so the accumulation runs as a
+        single kernel. The operands must be all public or all private.
+        """
+        assert len(indices) == len(tensors), "lists must have matching lengths"
+        index = torch.cat(indices)
+        if all(isinstance(t, (int, float)) or is_tensor(t) for t in tensors):
+            encoded = torch_cat(
+                [self.encoder.encode(t) for t in tensors], dim=dim
+            )
+            if self.rank == 0:
+                self._tensor.index_add_(dim, index, encoded)
+        elif all(isinstance(t, ArithmeticSharedTensor) for t in tensors):
+            self._tensor.index_add_(
+                dim, index, torch_cat([t._tensor for t in tensors], dim=dim)
+            )
+        else:
+            raise TypeError("index_add_batch_ tensors of unsupported type")
+        return self
+
     def scatter_add(self, dim, index, other):
         """Adds all values from the tensor other into self at the indices
         specified in the index tensor in a similar fashion as scatter_(). For
@@ -593,14 +742,41 @@ class ArithmeticSharedTensor(object):
         """Perform a sum pooling on each 2D matrix of the given tensor"""
         result = self.shallow_copy()
 
-        result.share = torch.nn.functional.avg_pool2d(
-            self.share,
-            kernel_size,
-            stride=stride,
-            padding=padding,
-            ceil_mode=ceil_mode,
-            divisor_override=1,
+        kernel = (
+            (kernel_size, kernel_size) if isinstance(kernel_size, int) else kernel_size
         )
+        if (
+            min(kernel) >= 4
+            and not ceil_mode
+            and torch.is_tensor(self.share)
+        ):
+            # For larger kernels, summing strided unfold views beats the
+            # pooling kernel, which is not tuned for int64 tensors. The
+            # views are dtype-agnostic and need no extra copies beyond the
+            # optional zero padding.
+            if stride is None:
+                stride = kernel
+            elif isinstance(stride, int):
+                stride = (stride, stride)
+            pad = (padding, padding) if isinstance(padding, int) else padding
+            share = self.share
+            if pad[0] > 0 or pad[1] > 0:
+                share = torch.nn.functional.pad(
+                    share, (pad[1], pad[1], pad[0], pad[0])
+                )
+            patches = share.unfold(-2, kernel[0], stride[0])
+            # the height unfold appended a patch dim, so width is now at -2
+            patches = patches.unfold(-2, kernel[1], stride[1])
+            result.share = patches.sum(dim=(-2, -1))
+        else:
+            result.share = torch.nn.functional.avg_pool2d(
+                self.share,
+                kernel_size,
+                stride=stride,
+                padding=padding,
+                ceil_mode=ceil_mode,
+                divisor_override=1,
+            )
         return result
 
     def take(self, index, dimension=None):
@@ -612,6 +788,10 @@ class ArithmeticSharedTensor(object):
         index = index.long()
         if dimension is None or self.dim() == 0:
             result.share = torch.take(self.share, index)
+        elif index.dim() == 1:
+            # Contiguous single-kernel gather; equivalent to the advanced
+            # indexing below for 1-D indices.
+            result.share = self.share.index_select(dimension, index)
         else:
             all_indices = [slice(0, x) for x in self.size()]
             all_indices[dimension] = index
@@ -640,11 +820,12 @@ class ArithmeticSharedTensor(object):
         assert self.size() == y.size(), "Number of elements do not match"
         if weights is not None:
             assert weights.size() == self.size(), "Incorrect number of weights"
-            result = self * weights
+            result = self.mul(weights).mul_(y)
         else:
-            result = self.clone()
+            # non-inplace mul already produces a fresh tensor; no clone needed
+            result = self.mul(y)
 
-        return result.mul_(y).sum()
+        return result.sum()
 
     def ger(self, y):
         """Computer an outer product between two vectors"""
@@ -662,14 +843,12 @@ class ArithmeticSharedTensor(object):
 
         Returns: ArithmeticSharedTensor or torch.tensor
         """
+        # The arithmetic form y + (self - y) * condition evaluates the
+        # selection with a single multiplication -- one Beaver round when the
+        # condition is private -- instead of masking both operands.
         if is_tensor(condition):
             condition = condition.float()
-            y_masked = y * (1 - condition)
-        else:
-            # encrypted tensor must be first operand
-            y_masked = (1 - condition) * y
-
-        return self * condition + y_masked
+        return (self - y) * condition + y
 
     def scatter_(self, dim, index, src):
         """Writes all values from the tensor `src` into `self` at the indices
@@ -713,6 +892,63 @@ class ArithmeticSharedTensor(object):
         return -self + tensor
 
 
+class ArithmeticSharedTensorBatch(object):
+    """Struct-of-tensors wrapper over same-shape ArithmeticSharedTensors.
+
+    Stacks the shares of `k` tensors along a leading batch axis so that
+    elementwise add/sub/mul and batched matmul execute as single kernels --
+    and private multiplications as a single Beaver round -- instead of `k`
+    Python-level operations. Convert back with `unbind()` at boundary
+    points; all inputs must share a common fixed-point scale.
+    """
+
+    def __init__(self, tensors):
+        assert isinstance(tensors, list) and len(tensors) > 0, "input must be a list"
+        scale = tensors[0].encoder.scale
+        assert all(
+            tensor.encoder.scale == scale for tensor in tensors
+        ), "batched tensors must share a fixed-point scale"
+        self._stacked = ArithmeticSharedTensor.stack(tensors)
+
+    @staticmethod
+    def _from_stacked(stacked):
+        batch = ArithmeticSharedTensorBatch.__new__(ArithmeticSharedTensorBatch)
+        batch._stacked = stacked
+        return batch
+
+    def _apply(self, op, y):
+        if isinstance(y, ArithmeticSharedTensorBatch):
+            y = y._stacked
+        return ArithmeticSharedTensorBatch._from_stacked(
+            getattr(self._stacked, op)(y)
+        )
+
+    def add(self, y):
+        """Perform batched element-wise addition"""
+        return self._apply("add", y)
+
+    def sub(self, y):
+        """Perform batched element-wise subtraction"""
+        return self._apply("sub", y)
+
+    def mul(self, y):
+        """Perform batched element-wise multiplication"""
+        return self._apply("mul", y)
+
+    def matmul(self, y):
+        """Perform batched matrix multiplication (one bmm per party)"""
+        return self._apply("matmul", y)
+
+    def unbind(self):
+        """Splits the batch back into individual ArithmeticSharedTensors"""
+        results = []
+        for share in self._stacked.share.unbind(0):
+            result = self._stacked.shallow_copy()
+            result.share = share
+            results.append(result)
+        return results
+
+
 REGULAR_FUNCTIONS = [
     "clone",
     "__getitem__",
@@ -744,17 +980,34 @@ PROPERTY_FUNCTIONS = ["__len__", "nelement", "dim", "size", "numel"]
 
 
 def _add_regular_function(function_name):
+    # Resolve the method descriptor once per share type instead of per call.
+    # Shares are usually torch.Tensors but may be CUDALongTensors on GPU, so
+    # the descriptor cannot be captured unconditionally at import time.
+    method_cache = {}
+
     def regular_func(self, *args, **kwargs):
         result = self.shallow_copy()
-        result.share = getattr(result.share, function_name)(*args, **kwargs)
+        share = result.share
+        method = method_cache.get(share.__class__)
+        if method is None:
+            method = getattr(share.__class__, function_name)
+            method_cache[share.__class__] = method
+        result.share = method(share, *args, **kwargs)
         return result
 
     setattr(ArithmeticSharedTensor, function_name, regular_func)
 
 
 def _add_property_function(function_name):
+    method_cache = {}
+
     def property_func(self, *args, **kwargs):
-        return getattr(self.share, function_name)(*args, **kwargs)
+        share = self.share
+        method = method_cache.get(share.__class__)
+        if method is None:
+            method = getattr(share.__class__, function_name)
+            method_cache[share.__class__] = method
+        return method(share, *args, **kwargs)
 
     setattr(ArithmeticSharedTensor, function_name, property_func)
 
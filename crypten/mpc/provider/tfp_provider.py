@@ -7,7 +7,11 @@
 
 import crypten.communicator as comm
 import torch
-from crypten.common.rng import generate_kbit_random_tensor, generate_random_ring_element
+from crypten.common.rng import (
+    generate_kbit_random_tensor,
+    generate_random_ring_element,
+    generate_random_ring_elements,
+)
 from crypten.common.util import count_wraps, torch_stack
 from crypten.mpc.primitives import ArithmeticSharedTensor, BinarySharedTensor
 
@@ -18,8 +22,7 @@ class TrustedFirstParty:
     @staticmethod
     def generate_additive_triple(size0, size1, op, device=None, *args, **kwargs):
         """Generate multiplicative triples of given sizes"""
-        a = generate_random_ring_element(size0, device=device)
-        b = generate_random_ring_element(size1, device=device)
+        a, b = generate_random_ring_elements([size0, size1], device=device)
 
         c = getattr(torch, op)(a, b, *args, **kwargs)
 
@@ -57,10 +60,7 @@ class TrustedFirstParty:
     def wrap_rng(size, device=None):
         """Generate random shared tensor of given size and sharing of its wraps"""
         num_parties = comm.get().get_world_size()
-        r = [
-            generate_random_ring_element(size, device=device)
-            for _ in range(num_parties)
-        ]
+        r = generate_random_ring_elements([size] * num_parties, device=device)
         theta_r = count_wraps(r)
 
         shares = comm.get().scatter(r, src=0)
@@ -14,10 +14,13 @@ import crypten
 import crypten.communicator as comm
 import torch
 import torch.nn.functional as F
-from crypten.common.rng import generate_random_ring_element
+from crypten.common.rng import (
+    generate_random_ring_element,
+    generate_random_ring_elements,
+)
 from crypten.common.tensor_types import is_float_tensor
 from crypten.common.util import count_wraps
-from crypten.mpc.primitives import ArithmeticSharedTensor
+from crypten.mpc.primitives import ArithmeticSharedTensor, ArithmeticSharedTensorBatch
 from test.multiprocess_test_case import MultiProcessTestCase, get_random_test_tensor
 
 
@@ -184,6 +187,58 @@ class TestArithmetic(MultiProcessTestCase):
         encrypted_out = 2 * encrypted
         self._check(encrypted_out, reference, "right mul failed")
 
+    def test_mul_batch(self):
+        """Tests batched multiplication of pairs of encrypted tensors."""
+        tensors1 = [get_random_test_tensor(is_float=True) for _ in range(4)]
+        tensors2 = [get_random_test_tensor(is_float=True) for _ in range(4)]
+        encrypted1 = [ArithmeticSharedTensor(tensor) for tensor in tensors1]
+        encrypted2 = [ArithmeticSharedTensor(tensor) for tensor in tensors2]
+
+        encrypted_out = ArithmeticSharedTensor.mul_batch(encrypted1, encrypted2)
+        for result, tensor1, tensor2 in zip(encrypted_out, tensors1, tensors2):
+            self._check(result, tensor1 * tensor2, "mul_batch failed")
+
+        # Check original inputs are not modified
+        for encrypted, tensor in zip(encrypted1, tensors1):
+            self._check(encrypted, tensor, "mul_batch modified its input")
+
+        # Mixing fixed-point scales within a batch must be rejected since the
+        # stacked product is truncated by a single scale.
+        integer_tensor = get_random_test_tensor(is_float=False)
+        encrypted1[0] = ArithmeticSharedTensor(integer_tensor, precision=0)
+        with self.assertRaises(AssertionError):
+            ArithmeticSharedTensor.mul_batch(encrypted1, encrypted2)
+
+    def test_batch(self):
+        """Tests batched operations on stacked encrypted tensors."""
+        tensors1 = [get_random_test_tensor(size=(4, 4), is_float=True) for _ in range(3)]
+        tensors2 = [get_random_test_tensor(size=(4, 4), is_float=True) for _ in range(3)]
+        encrypted1 = ArithmeticSharedTensorBatch(
+            [ArithmeticSharedTensor(tensor) for tensor in tensors1]
+        )
+        encrypted2 = ArithmeticSharedTensorBatch(
+            [ArithmeticSharedTensor(tensor) for tensor in tensors2]
+        )
+
+        for func in ["add", "sub", "mul", "matmul"]:
+            reference = [
+                getattr(tensor1, func)(tensor2)
+                for tensor1, tensor2 in zip(tensors1, tensors2)
+            ]
+            encrypted_out = getattr(encrypted1, func)(encrypted2).unbind()
+            self.assertEqual(len(encrypted_out), len(reference))
+            for result, ref in zip(encrypted_out, reference):
+                self._check(result, ref, "batched %s failed" % func)
+
+        # Mixing fixed-point scales within a batch must be rejected
+        integer_tensor = get_random_test_tensor(size=(4, 4), is_float=False)
+        mixed = [
+            ArithmeticSharedTensor(tensors1[0]),
+            ArithmeticSharedTensor(integer_tensor, precision=0),
+        ]
+        with self.assertRaises(AssertionError):
+            ArithmeticSharedTensorBatch(mixed)
+
     def test_sum(self):
         """Tests sum reduction on encrypted tensor."""
         tensor = get_random_test_tensor(size=(5, 100, 100), is_float=True)
@@ -264,6 +319,36 @@ class TestArithmetic(MultiProcessTestCase):
         ).sum() == reference.nelement()
         self.assertTrue(test_passed, "%d-party wraps failed" % num_parties)
 
+    def test_przs_into(self):
+        """Tests PRZS generation into a preallocated share buffer"""
+        out = torch.empty((5, 5), dtype=torch.long)
+        encrypted = ArithmeticSharedTensor.PRZS_into(out)
+        self.assertTrue(encrypted.share is out, "PRZS_into reallocated its buffer")
+
+        # Shares must sum to zero across parties
+        result = comm.get().all_reduce(encrypted.share.clone())
+        self.assertTrue(
+            (result == 0).all().item(), "PRZS_into shares do not sum to zero"
+        )
+
+    def test_random_ring_elements(self):
+        """Tests batched random ring element generation"""
+        sizes = [(3, 4), (7,), (2, 2, 2)]
+        generator = torch.Generator()
+        generator.manual_seed(0)
+        elements = generate_random_ring_elements(sizes, generator=generator)
+        self.assertEqual(
+            [element.size() for element in elements],
+            [torch.Size(size) for size in sizes],
+        )
+
+        # The batch must consume the generator identically to one flat draw
+        generator.manual_seed(0)
+        numel = sum(torch.Size(size).numel() for size in sizes)
+        flat = generate_random_ring_element((numel,), generator=generator)
+        batched = torch.cat([element.flatten() for element in elements])
+        self.assertTrue(torch.equal(batched, flat), "batched draw mismatch")
+
     def test_matmul(self):
         """Test matrix multiplication."""
         for tensor_type in [lambda x: x, ArithmeticSharedTensor]:
@@ -325,6 +410,36 @@ class TestArithmetic(MultiProcessTestCase):
                             "%s %s failed" % ("private" if private else "public", func),
                         )
 
+    def test_index_add_batch(self):
+        """Test index_add_batch_ function of encrypted tensor"""
+        tensor1 = get_random_test_tensor(size=(12, 5), is_float=True)
+        indices = [
+            torch.tensor([0, 2, 4], dtype=torch.long),
+            torch.tensor([1, 3, 5], dtype=torch.long),
+        ]
+        tensors = [get_random_test_tensor(size=(3, 5), is_float=True) for _ in range(2)]
+        for tensor_type in [lambda x: x, ArithmeticSharedTensor]:
+            encrypted = ArithmeticSharedTensor(tensor1)
+            reference = tensor1.clone()
+            for index, tensor in zip(indices, tensors):
+                reference.index_add_(0, index, tensor)
+            encrypted.index_add_batch_(
+                0, indices, [tensor_type(tensor) for tensor in tensors]
+            )
+            private = tensor_type == ArithmeticSharedTensor
+            self._check(
+                encrypted,
+                reference,
+                "%s index_add_batch_ failed" % ("private" if private else "public"),
+            )
+
+        # Mixing public and private operands in one batch is rejected
+        encrypted = ArithmeticSharedTensor(tensor1)
+        with self.assertRaises(TypeError):
+            encrypted.index_add_batch_(
+                0, indices, [tensors[0], ArithmeticSharedTensor(tensors[1])]
+            )
+
     def test_scatter(self):
         """Test scatter/scatter_add function of encrypted tensor"""
         funcs = ["scatter", "scatter_", "scatter_add", "scatter_add_"]
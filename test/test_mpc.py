@@ -1095,6 +1095,16 @@ class TestMPC(object):
             encrypted_out = getattr(encrypted_tensor, func)()
             self._check(encrypted_out, reference, "%s failed" % func)
 
+        # Test reusing one precomputed sign comparison across both functions
+        with crypten.no_grad():
+            ltz = encrypted_tensor._ltz(_scale=False)
+            for func in cases:
+                reference = getattr(tensor, func)()
+                encrypted_out = getattr(encrypted_tensor, func)(_ltz=ltz)
+                self._check(
+                    encrypted_out, reference, "%s with precomputed _ltz failed" % func
+                )
+
     def test_hardtanh(self):
         tensor = torch.arange(-10, 10, dtype=torch.float32)
         encrypted = MPCTensor(tensor)
@@ -1140,6 +1150,13 @@ class TestMPC(object):
             encrypted_out = getattr(encrypted_tensor, func)()
             self._check(encrypted_out, reference, "%s failed" % func)
 
+        # Test batched public phase shifts evaluated in a single pass
+        shifts = [0.0, 0.5, -1.0]
+        encrypted_cos, encrypted_sin = encrypted_tensor.cossin(shifts=shifts)
+        for i, shift in enumerate(shifts):
+            self._check(encrypted_cos[i], (tensor + shift).cos(), "shifted cos failed")
+            self._check(encrypted_sin[i], (tensor + shift).sin(), "shifted sin failed")
+
     def test_softmax(self):
         """Test softmax and log_softmax function"""
         for softmax_fn in ["softmax", "log_softmax"]: